@@ -12,9 +12,42 @@ This implementation ensures correct numeric ordering without requiring zero-padd
 
 import os
 import re
-import argparse
-import subprocess
-from typing import List
+import queue
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+from typing import IO, Iterable, List, Optional
+
+
+_SPLIT_DIGITS = re.compile(r'([0-9]+)').split
+_FRAME_NAME = re.compile(r'(.*?)([0-9]+)(\.[^.]+)').fullmatch
+_DIGITS_ONLY = re.compile(r'[0-9]+').fullmatch
+_IMAGE_EXTENSIONS = frozenset(('.png', '.jpg', '.jpeg'))
+
+FFMPEG_ERROR_TAIL_BYTES = 64 * 1024
+
+X264_PRESETS = (
+    'ultrafast', 'superfast', 'veryfast', 'faster', 'fast',
+    'medium', 'slow', 'slower', 'veryslow', 'placebo'
+)
+
+
+@lru_cache(maxsize=None)
+def natural_sort_key(name: str) -> tuple:
+    """
+    Build the natural sort key for a filename.
+    
+    Keys are cached because recursive mode sorts many folders that usually
+    share the same frame names (frame0.png ... frameN.png).
+    
+    Args:
+        name: Filename to build the key for
+        
+    Returns:
+        Tuple alternating lowercased text parts and integer numeric parts
+    """
+    return tuple(int(c) if c.isdigit() else c for c in _SPLIT_DIGITS(name.lower()))
 
 
 def natural_sort(file_list: List[str]) -> List[str]:
@@ -31,13 +64,178 @@ def natural_sort(file_list: List[str]) -> List[str]:
     Returns:
         Alphanumerically sorted list of filenames (numeric parts sorted as integers)
     """
-    def convert(text):
-        return int(text) if text.isdigit() else text.lower()
+    return sorted(file_list, key=natural_sort_key)
+
+
+def sort_frames(frame_files: List[str]) -> List[str]:
+    """
+    Sort frame filenames, skipping the general natural sort when possible.
     
-    def alphanum_key(key):
-        return [convert(c) for c in re.split('([0-9]+)', key)]
+    Most frame directories name every file <prefix><number><ext> with the same
+    prefix and extension (e.g. frame_1.png, frame_10.png). In that case the
+    frames are ordered by the integer alone, which gives the same order as
+    natural_sort() without building a key per part. If the integers are also
+    a gap-free run without duplicates (e.g. 0..N-1), each frame is placed
+    directly at its index and no sort is needed. Any other naming falls back
+    to natural_sort().
+    
+    Args:
+        frame_files: List of frame filenames to sort
+        
+    Returns:
+        Frame filenames in natural order
+    """
+    match = _FRAME_NAME(frame_files[0]) if frame_files else None
+    if match:
+        prefix, ext = match.group(1), match.group(3)
+        start, ext_len = len(prefix), len(ext)
+        if all(
+            f.startswith(prefix) and f.endswith(ext) and _DIGITS_ONLY(f, start, len(f) - ext_len)
+            for f in frame_files
+        ):
+            numbers = [int(f[start:-ext_len]) for f in frame_files]
+            first = min(numbers)
+            
+            if max(numbers) - first + 1 == len(frame_files) and len(set(numbers)) == len(frame_files):
+                sorted_frames = [None] * len(frame_files)
+                for f, number in zip(frame_files, numbers):
+                    sorted_frames[number - first] = f
+                return sorted_frames
+            
+            return [f for _, f in sorted(zip(numbers, frame_files), key=lambda pair: pair[0])]
     
-    return sorted(file_list, key=alphanum_key)
+    return natural_sort(frame_files)
+
+
+def is_image_file(filename: str) -> bool:
+    """
+    Check whether a filename has a supported image extension.
+    
+    Only the extension is lowercased, not the whole filename.
+    
+    Args:
+        filename: Filename to check
+        
+    Returns:
+        True if the extension is .png, .jpg or .jpeg (case-insensitive)
+    """
+    dot = filename.rfind('.')
+    return dot >= 0 and filename[dot:].lower() in _IMAGE_EXTENSIONS
+
+
+def link_frame_sequence(
+    frames_path: str,
+    sorted_frames: List[str],
+    ext: str,
+    temp_root: str
+) -> Optional[str]:
+    """
+    Link sorted frames into a temporary directory as a zero-padded numbered sequence.
+    
+    FFmpeg's image2 demuxer can then read the frames directly from a numeric
+    pattern (f_00000000.png, f_00000001.png, ...) instead of parsing a concat
+    list with one entry per frame.
+    
+    Args:
+        frames_path: Directory containing the image frames
+        sorted_frames: Frame filenames in the order they should appear
+        ext: Extension shared by all frames (e.g. ".png")
+        temp_root: Directory in which to create the temporary link directory
+        
+    Returns:
+        FFmpeg input pattern for the linked sequence (with '%' in the
+        directory escaped as '%%'), or None if links can't be created
+    """
+    source_dir = os.path.abspath(frames_path)
+    
+    # Hardlinks are cheapest but need the frames and temp_root on the same
+    # filesystem; symlinks work across filesystems where they're supported
+    for make_link in (os.link, os.symlink):
+        link_dir = tempfile.mkdtemp(prefix='.frames_', dir=temp_root)
+        try:
+            for i, frame in enumerate(sorted_frames):
+                make_link(os.path.join(source_dir, frame), os.path.join(link_dir, f"f_{i:08d}{ext}"))
+        except (OSError, NotImplementedError):
+            shutil.rmtree(link_dir, ignore_errors=True)
+        else:
+            # The image2 demuxer reads the whole path as a printf-style
+            # pattern, so any '%' in the directory must be escaped
+            return os.path.join(link_dir.replace('%', '%%'), f"f_%08d{ext}")
+    
+    return None
+
+
+def pipe_frames_to_ffmpeg(
+    ffmpeg_command: List[str],
+    frame_paths: Iterable[str],
+    stderr_file: IO[bytes]
+) -> int:
+    """
+    Run FFmpeg reading image2pipe input from stdin and stream the frames into it.
+    
+    Frames are read from disk by a background thread into a small bounded
+    queue, so reading the next frame overlaps with FFmpeg consuming the
+    current one.
+    
+    Args:
+        ffmpeg_command: FFmpeg command reading its input from '-'
+        frame_paths: Paths of the frames in the order they should appear
+        stderr_file: File that receives FFmpeg's stderr output
+        
+    Returns:
+        FFmpeg's return code
+    """
+    import subprocess
+    
+    frames = queue.Queue(maxsize=8)
+    stop = threading.Event()
+    read_errors = []
+    
+    def read_frames():
+        try:
+            for path in frame_paths:
+                if stop.is_set():
+                    return
+                with open(path, 'rb') as src:
+                    frames.put(src.read())
+        except Exception as e:
+            read_errors.append(e)
+        finally:
+            frames.put(None)
+    
+    # stderr must go to a file: a chatty FFmpeg could otherwise fill the pipe
+    # and stall while we're blocked writing frames to stdin
+    process = subprocess.Popen(
+        ffmpeg_command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=stderr_file
+    )
+    reader = threading.Thread(target=read_frames, daemon=True)
+    reader.start()
+    try:
+        for data in iter(frames.get, None):
+            process.stdin.write(data)
+        if read_errors:
+            raise read_errors[0]
+        process.stdin.close()
+    except BrokenPipeError:
+        # FFmpeg exited early; its return code and stderr explain why
+        pass
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        # Unblock the reader if we stopped consuming before it finished
+        stop.set()
+        while reader.is_alive():
+            try:
+                frames.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    
+    return process.wait()
 
 
 def create_video_from_frames(
@@ -46,7 +244,9 @@ def create_video_from_frames(
     output_filename: str = None,
     fps: int = 20,
     resolution: str = "256x256",
-    recursive: bool = False
+    recursive: bool = False,
+    jobs: Optional[int] = None,
+    preset: str = "ultrafast"
 ) -> None:
     """
     Create a video from a sequence of image frames using natural sorting.
@@ -58,26 +258,40 @@ def create_video_from_frames(
         fps: Frames per second for the output video
         resolution: Resolution of the output video (WIDTHxHEIGHT)
         recursive: Whether to process subdirectories recursively
+        jobs: Number of folders to encode in parallel in recursive mode
+            (defaults to the number of CPUs)
+        preset: libx264 encoding preset
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_path, exist_ok=True)
     
     # Process the directory or directories
     if recursive:
-        folders = [f for f in os.listdir(frames_path) if os.path.isdir(os.path.join(frames_path, f))]
+        with os.scandir(frames_path) as entries:
+            folders = [entry.name for entry in entries if entry.is_dir()]
         if not folders:
             # If no subdirectories found but recursive was requested, process the main directory
-            process_single_directory(frames_path, output_path, None, fps, resolution)
+            process_single_directory(frames_path, output_path, None, fps, resolution, preset)
         else:
-            for folder in folders:
-                try:
-                    folder_frames_path = os.path.join(frames_path, folder)
-                    process_single_directory(folder_frames_path, output_path, folder, fps, resolution)
-                except Exception as e:
-                    print(f"Error processing folder {folder}: {str(e)}")
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # Each folder gets its own ffmpeg process, so encode them concurrently
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(
+                        process_single_directory,
+                        os.path.join(frames_path, folder), output_path, folder, fps, resolution, preset
+                    )
+                    for folder in folders
+                ]
+                for folder, future in zip(folders, futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error processing folder {folder}: {str(e)}")
     else:
         # Process just the single directory
-        process_single_directory(frames_path, output_path, output_filename, fps, resolution)
+        process_single_directory(frames_path, output_path, output_filename, fps, resolution, preset)
     
     print("All videos have been processed!")
 
@@ -87,7 +301,8 @@ def process_single_directory(
     output_path: str,
     output_filename: str = None,
     fps: int = 20,
-    resolution: str = "256x256"
+    resolution: str = "256x256",
+    preset: str = "ultrafast"
 ) -> None:
     """
     Process a single directory of frames to create a video.
@@ -98,7 +313,10 @@ def process_single_directory(
         output_filename: Name of the output video file (without extension)
         fps: Frames per second for the output video
         resolution: Resolution of the output video (WIDTHxHEIGHT)
+        preset: libx264 encoding preset
     """
+    import subprocess
+    
     # Determine output filename if not provided
     if not output_filename:
         output_filename = os.path.basename(frames_path.rstrip("/\\"))
@@ -112,56 +330,101 @@ def process_single_directory(
     print(f"Processing {frames_path} -> {output_video_path}")
     
     # Get and sort frame files
-    frame_files = [f for f in os.listdir(frames_path) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    with os.scandir(frames_path) as entries:
+        frame_files = [
+            entry.name for entry in entries
+            if is_image_file(entry.name) and entry.is_file()
+        ]
     
     if not frame_files:
         print(f"No image files found in {frames_path}")
         return
     
-    sorted_frames = natural_sort(frame_files)
+    sorted_frames = sort_frames(frame_files)
     
-    # Create a temporary file listing frames in correct order
-    list_file_path = os.path.join(output_path, f'{base_name}_frames.txt')
-    frame_duration = 1.0 / fps
+    # Frames sharing one extension are linked into a numeric sequence for the
+    # image2 demuxer, or streamed over stdin if links aren't available. Mixed
+    # extensions need a concat list so FFmpeg can probe each file.
+    # Take the extension as is_image_file() does, so a file named just
+    # ".png" keeps its extension (os.path.splitext would give '')
+    first_frame = sorted_frames[0]
+    ext = first_frame[first_frame.rfind('.'):]
+    sequence_pattern = None
+    list_file_path = None
+    pipe_frames = False
     
-    with open(list_file_path, 'w') as f:
-        for frame in sorted_frames:
-            # Write full path to each frame
-            f.write(f"file '{os.path.join(frames_path, frame)}'\n")
-            f.write(f"duration {frame_duration}\n")
+    if all(frame.endswith(ext) for frame in sorted_frames):
+        sequence_pattern = link_frame_sequence(frames_path, sorted_frames, ext, output_path)
+        if sequence_pattern:
+            input_args = ['-framerate', str(fps), '-i', sequence_pattern]
+        else:
+            pipe_frames = True
+            input_args = ['-f', 'image2pipe', '-framerate', str(fps), '-i', '-']
+    else:
+        # Create a temporary file listing frames in correct order
+        list_file_path = os.path.join(output_path, f'{base_name}_frames.txt')
+        frame_duration = 1.0 / fps
+        
+        # Write full path to each frame; every entry shares the same text
+        # around the filename, so the list is a single str.join
+        entry_start = f"file '{os.path.join(os.path.abspath(frames_path), '')}"
+        entry_end = f"'\nduration {frame_duration}\n"
+        with open(list_file_path, 'w', buffering=1 << 20) as f:
+            f.write(entry_start + (entry_end + entry_start).join(sorted_frames) + entry_end)
+        
+        input_args = ['-f', 'concat', '-safe', '0', '-i', list_file_path]
     
     # FFmpeg command
     ffmpeg_command = [
         'ffmpeg', '-y',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', list_file_path,
+        *input_args,
         '-s', resolution,
         '-c:v', 'libx264',
+        '-preset', preset,
+        '-threads', '0',
         '-pix_fmt', 'yuv420p',
         '-r', str(fps),
         output_video_path
     ]
     
-    # Execute ffmpeg command
-    process = subprocess.run(
-        ffmpeg_command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    # Clean up the temporary file
-    os.remove(list_file_path)
-    
-    if process.returncode == 0:
-        print(f"✓ Successfully created video: {output_video_path}")
-    else:
-        print(f"✗ Error creating video for {frames_path}")
-        print(f"FFmpeg error: {process.stderr.decode()}")
+    # Execute ffmpeg command, spooling stderr to a temporary file that is
+    # only read back if the encode fails
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            if pipe_frames:
+                returncode = pipe_frames_to_ffmpeg(
+                    ffmpeg_command,
+                    (os.path.join(frames_path, frame) for frame in sorted_frames),
+                    stderr_file
+                )
+            else:
+                returncode = subprocess.run(
+                    ffmpeg_command,
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr_file
+                ).returncode
+        finally:
+            # Clean up the temporary links or list file
+            if sequence_pattern:
+                link_dir = os.path.dirname(sequence_pattern).replace('%%', '%')
+                shutil.rmtree(link_dir, ignore_errors=True)
+            if list_file_path:
+                os.remove(list_file_path)
+        
+        if returncode == 0:
+            print(f"✓ Successfully created video: {output_video_path}")
+        else:
+            # The end of FFmpeg's output is where the error is reported
+            stderr_file.seek(0, os.SEEK_END)
+            stderr_file.seek(max(0, stderr_file.tell() - FFMPEG_ERROR_TAIL_BYTES))
+            print(f"✗ Error creating video for {frames_path}")
+            print(f"FFmpeg error: {stderr_file.read().decode(errors='replace')}")
 
 
 def main():
     """Parse arguments and run the video generation process."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Create videos from image frames without requiring zero-padding in filenames.'
     )
@@ -202,15 +465,33 @@ def main():
         help='Process subdirectories recursively'
     )
     
+    parser.add_argument(
+        '--preset',
+        default='ultrafast',
+        choices=X264_PRESETS,
+        help='libx264 encoding preset; slower presets give smaller files (default: ultrafast)'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Number of folders to process in parallel in recursive mode (default: number of CPUs)'
+    )
+    
     args = parser.parse_args()
     
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    
     create_video_from_frames(
         args.input,
         args.output,
         args.name,
         args.fps,
         args.resolution,
-        args.recursive
+        args.recursive,
+        args.jobs,
+        args.preset
     )
 
 